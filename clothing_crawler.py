@@ -1,17 +1,19 @@
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import sqlite3
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from urllib.parse import urljoin
-import json
+import orjson
 import re
+from functools import lru_cache
+from contextlib import suppress
+import multiprocessing
 import yaml
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.common.keys import Keys
-import time
-from selenium.webdriver.chrome.options import Options
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 
 # Configurations
 CONFIG_FILE = "config.yaml"
@@ -24,117 +26,244 @@ with open(CONFIG_FILE, 'r') as f:
 
 BASE_URL = config['base_url']
 PRODUCTS_PER_SUBCATEGORY = config['products_per_subcategory']
+USE_BROWSER = config.get('use_browser', False)  # Fall back to headless Chromium for listing pages
+BROWSER_PAGES = config.get('browser_pages', 4)  # Listing pages rendered concurrently in the browser
+PRODUCT_WORKERS = config.get('product_workers', 8)  # Concurrent product page fetches per subcategory
+IMAGE_WORKERS = config.get('image_workers', 8)  # Concurrent image downloads per product
+CATEGORY_PROCESSES = config.get('category_processes', 4)  # Subcategories crawled in parallel, one process each
+INSERT_BATCH_SIZE = 200  # Product rows per executemany call and transaction
+DB_TIMEOUT = 30  # Seconds a worker waits for another process's write lock
+
+SANITIZE_PATTERN = re.compile(r'[^\w\-\_\u0600-\u06FF ]')  # Characters not allowed in folder names
+
+# Listing page classes
+PRODUCT_CARD_CLASS = "cp-card--product-card"
+PRODUCT_LINK_CLASS = "c-product-card__image-container"
+PRODUCT_CARD_STRAINER = SoupStrainer(class_=PRODUCT_CARD_CLASS)  # Only build the product cards of a listing
+PRODUCT_CARDS_SCRIPT = (
+    f"() => Array.from(document.querySelectorAll('.{PRODUCT_CARD_CLASS}')).map(e => ({{"
+    f"id: e.dataset.productId, href: e.querySelector('.{PRODUCT_LINK_CLASS}')?.href"
+    f"}}))"
+)
+NEW_CARDS_SCRIPT = (
+    f"([count, height]) => document.querySelectorAll('.{PRODUCT_CARD_CLASS}').length > count"
+    f" || document.body.scrollHeight !== height"
+)
+
+# Product page selectors
+TITLE_SELECTOR = "h3.c-product-page__features-subtitle"
+PRICE_SELECTOR = "div.c-product-page__selling-price.js-selling-price"
+OLD_PRICE_SELECTOR = "del.c-product-page__rrp-price.js-rrp-price"
+DISCOUNT_SELECTOR = "span.js-discount-percent-value"
+DESCRIPTION_SELECTOR = "div.c-product-page__features-description"
+SPECS_TABLE_SELECTOR = "ul.c-product__specs-table"  # Only the first specs table is read
+SPECS_TITLE_SELECTOR = "li.c-product__specs-table-item div.c-product__specs-table-item-title"
+SPECS_VALUE_CLASS = "c-product__specs-table-value"
+ADDITIONAL_DETAILS_SELECTOR = "div.c-product-page__features-content"
+GALLERY_IMAGE_SELECTOR = "img.c-product-page__gallery-image"
+
+# Shared HTTP session so page and image fetches reuse keep-alive connections
+SESSION = requests.Session()
+# Each product worker may have a page fetch plus IMAGE_WORKERS image downloads in flight
+SESSION.mount('https://', HTTPAdapter(
+    pool_connections=32, pool_maxsize=PRODUCT_WORKERS * (IMAGE_WORKERS + 1), pool_block=True,
+    max_retries=Retry(total=3, backoff_factor=0.3)
+))
+SESSION.headers['User-Agent'] = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+SESSION.headers['Accept-Encoding'] = 'br, gzip'  # Brotli decoding needs the brotli package
+REQUEST_TIMEOUT = 20  # Seconds
+IMAGE_CHUNK_SIZE = 64 * 1024  # Bytes per read/write when streaming images to disk
+SCROLL_TIMEOUT = 5  # Seconds to wait for new product cards after a scroll
+SCROLL_POLL_INTERVAL = 0.2  # Seconds between checks while waiting
+
+# Kept as one constant so every insert hits the connection's prepared statement cache.
+# Plain INSERT: duplicates are removed by create_product_index once the crawl ends.
+INSERT_PRODUCT_SQL = '''
+    INSERT INTO products (
+        main_category, sub_category, nested_category, product_id, title, price, old_price, discount, description, additional_details, specs, images, json_path
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+def connect_db():
+    """
+    Open a SQLite connection in WAL mode with relaxed sync settings.
+    WAL journaling keeps products.db-wal / products.db-shm next to the database;
+    they are folded back into products.db on checkpoint and are safe to ignore.
+    """
+    db_connection = sqlite3.connect(DB_FILE, timeout=DB_TIMEOUT, cached_statements=256)
+    db_connection.executescript('''
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA cache_size=-65536;
+        PRAGMA mmap_size=268435456;
+    ''')
+    return db_connection
+
+def create_tables(db_connection):
+    """
+    Create the categories table and recreate the products table from scratch.
+    The products unique index is created by create_product_index after the crawl.
+    """
+    cursor = db_connection.cursor()
 
-# Initialize SQLite database connection
-db_connection = sqlite3.connect(DB_FILE)
-cursor = db_connection.cursor()
-
-# Create categories and products tables
-cursor.execute('''
-    CREATE TABLE IF NOT EXISTS categories (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        main_category TEXT NOT NULL,
-        sub_category TEXT NOT NULL,
-        url TEXT,
-        UNIQUE (main_category, sub_category)
-    );
-''')
-
-# Drop the products table if it exists and recreate it with the nested_category column
-cursor.execute('DROP TABLE IF EXISTS products;')
-cursor.execute('''
-    CREATE TABLE IF NOT EXISTS products (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        main_category TEXT NOT NULL,
-        sub_category TEXT NOT NULL,
-        nested_category TEXT NOT NULL, -- Added nested_category column
-        product_id TEXT NOT NULL,
-        title TEXT,
-        subtitle TEXT,
-        price TEXT,
-        old_price TEXT,
-        discount TEXT,
-        description TEXT,
-        additional_details TEXT,
-        specs TEXT,
-        images TEXT,
-        json_path TEXT,
-        UNIQUE (main_category, sub_category, nested_category, product_id)
-    );
-''')
-
-db_connection.commit()
+    # Create categories and products tables
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            main_category TEXT NOT NULL,
+            sub_category TEXT NOT NULL,
+            url TEXT,
+            UNIQUE (main_category, sub_category)
+        );
+    ''')
+
+    # Drop the products table if it exists and recreate it with the nested_category column
+    cursor.execute('DROP TABLE IF EXISTS products;')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS products (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            main_category TEXT NOT NULL,
+            sub_category TEXT NOT NULL,
+            nested_category TEXT NOT NULL, -- Added nested_category column
+            product_id TEXT NOT NULL,
+            title TEXT,
+            subtitle TEXT,
+            price TEXT,
+            old_price TEXT,
+            discount TEXT,
+            description TEXT,
+            additional_details TEXT,
+            specs TEXT,
+            images TEXT,
+            json_path TEXT
+        );
+    ''')
+
+    db_connection.commit()
 
+def create_product_index(db_connection):
+    """
+    Build the unique products index once the bulk load is done, dropping any duplicate rows first.
+    Inserting without the index is faster than maintaining it row by row.
+    """
+    with db_connection:
+        db_connection.execute('''
+            DELETE FROM products WHERE id NOT IN (
+                SELECT MIN(id) FROM products
+                GROUP BY main_category, sub_category, nested_category, product_id
+            );
+        ''')
+        db_connection.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS ux_products
+            ON products (main_category, sub_category, nested_category, product_id);
+        ''')
+
+@lru_cache(maxsize=512)
 def sanitize_filename(name):
-    return re.sub(r'[^\w\-\_\u0600-\u06FF ]', '_', name)
+    return SANITIZE_PATTERN.sub('_', name)
+
+# Folders already created by this process, so repeat calls skip the filesystem
+created_dirs = set()
+
+def ensure_dir(path):
+    if path not in created_dirs:
+        os.makedirs(path, exist_ok=True)
+        created_dirs.add(path)
+
+# Whether this process has reported the server's Content-Encoding yet
+content_encoding_logged = False
 
-def get_soup(url):
-    response = requests.get(url)
+def get_soup(url, params=None, parse_only=None):
+    global content_encoding_logged
+    response = SESSION.get(url, params=params, timeout=REQUEST_TIMEOUT)
     response.raise_for_status()
+    if not content_encoding_logged:
+        print(f"Content-Encoding: {response.headers.get('Content-Encoding', 'identity')}")
+        content_encoding_logged = True
     response.encoding = 'utf-8'
-    return BeautifulSoup(response.text, 'html.parser')
+    return BeautifulSoup(response.text, 'lxml', parse_only=parse_only)
 
 def save_image(url, folder, filename):
     """
     Download an image from the given URL and save it to the specified folder.
+    Images already on disk from a previous run are not fetched again.
     """
-    os.makedirs(folder, exist_ok=True)
+    ensure_dir(folder)
     file_path = os.path.join(folder, filename)
+    if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
+        return file_path
+
+    # Download to a temporary name so an interrupted transfer is never mistaken for a finished image
+    part_path = f"{file_path}.part"
     try:
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
-        with open(file_path, 'wb') as f:
-            for chunk in response.iter_content(1024):
-                f.write(chunk)
+        with SESSION.get(url, stream=True, timeout=REQUEST_TIMEOUT) as response:
+            response.raise_for_status()
+            with open(part_path, 'wb') as f:
+                for chunk in response.iter_content(IMAGE_CHUNK_SIZE):
+                    f.write(chunk)
+        os.replace(part_path, file_path)
         print(f"Image saved: {file_path}")
         return file_path
     except requests.exceptions.RequestException as e:
         print(f"Failed to download image: {url}. Error: {e}")
         return None
+    finally:
+        # Only left behind when the download failed; a finished image was already renamed
+        with suppress(FileNotFoundError):
+            os.remove(part_path)
 
-
+def save_image_task(task):
+    """
+    Run save_image for one (url, folder, filename) task, turning any error into None
+    so a single bad image never discards the rest of the product.
+    """
+    try:
+        return save_image(*task)
+    except Exception as e:
+        print(f"Failed to download image: {task[0]}. Error: {e}")
+        return None
 
 def extract_product_metadata(product_url, main_category, sub_category, nested_category, product_id):
     """
     Extract detailed metadata and images from the product page.
+    Returns the parameter tuple for the products INSERT.
     """
     soup = get_soup(product_url)
 
     # Extract product title
-    subtitle = soup.find("h3", class_="c-product-page__features-subtitle")
+    subtitle = soup.select_one(TITLE_SELECTOR)
     product_title = subtitle.text.strip() if subtitle else "No Title Found"
 
     # Extract price
-    price_tag = soup.find("div", class_="c-product-page__selling-price js-selling-price")
+    price_tag = soup.select_one(PRICE_SELECTOR)
     product_price = price_tag.text.strip() if price_tag else None
 
     # Extract old price
-    old_price_tag = soup.find("del", class_="c-product-page__rrp-price js-rrp-price")
+    old_price_tag = soup.select_one(OLD_PRICE_SELECTOR)
     product_old_price = old_price_tag.text.strip() if old_price_tag else None
 
     # Extract discount
-    discount_tag = soup.find("span", class_="js-discount-percent-value")
+    discount_tag = soup.select_one(DISCOUNT_SELECTOR)
     product_discount = discount_tag.text.strip() if discount_tag else None
 
     # Extract description
-    description_tag = soup.find("div", class_="c-product-page__features-description")
+    description_tag = soup.select_one(DESCRIPTION_SELECTOR)
     product_description = description_tag.text.strip() if description_tag else None
 
-    # Extract specifications
+    # Extract specifications: select the titles once, then read each title's sibling values
     specs = {}
-    specs_table = soup.find("ul", class_="c-product__specs-table")
+    specs_table = soup.select_one(SPECS_TABLE_SELECTOR)
     if specs_table:
-        spec_items = specs_table.find_all("li", class_="c-product__specs-table-item")
-        for item in spec_items:
-            key = item.find("div", class_="c-product__specs-table-item-title")
-            values = item.find_all("div", class_="c-product__specs-table-value")
-            if key:
-                key_text = key.text.strip()
-                value_texts = [value.text.strip() for value in values]
-                specs[key_text] = ", ".join(value_texts)
+        for key in specs_table.select(SPECS_TITLE_SELECTOR):
+            values = key.find_next_siblings("div", class_=SPECS_VALUE_CLASS)
+            specs[key.text.strip()] = ", ".join(value.text.strip() for value in values)
 
     # Additional details
-    additional_details_div = soup.find("div", class_="c-product-page__features-content")
+    additional_details_div = soup.select_one(ADDITIONAL_DETAILS_SELECTOR)
     additional_details = additional_details_div.text.strip() if additional_details_div else None
 
     # Extract images
@@ -146,17 +275,22 @@ def extract_product_metadata(product_url, main_category, sub_category, nested_ca
         sanitize_filename(nested_category),
         product_id
     )
-    os.makedirs(product_folder, exist_ok=True)
+    ensure_dir(product_folder)
 
-    image_tags = soup.find_all("img", class_="c-product-page__gallery-image")
+    image_tags = soup.select(GALLERY_IMAGE_SELECTOR)
+    image_tasks = []
     for idx, img_tag in enumerate(image_tags):
         img_url = img_tag.get("src")
         if img_url:
             img_url = urljoin(BASE_URL, img_url)
             img_filename = f"{product_id}_image_{idx + 1}.jpg"
-            saved_path = save_image(img_url, product_folder, img_filename)
-            if saved_path:
-                images.append(saved_path)
+            image_tasks.append((img_url, product_folder, img_filename))
+
+    # Download the gallery concurrently; failed downloads return None and are skipped
+    if image_tasks:
+        with ThreadPoolExecutor(max_workers=min(IMAGE_WORKERS, len(image_tasks))) as executor:
+            saved_paths = list(executor.map(save_image_task, image_tasks))
+        images = [saved_path for saved_path in saved_paths if saved_path]
 
     # Save metadata to JSON
     metadata = {
@@ -175,74 +309,193 @@ def extract_product_metadata(product_url, main_category, sub_category, nested_ca
     }
 
     json_path = os.path.join(product_folder, f"{product_id}.json")
-    with open(json_path, "w", encoding="utf-8") as json_file:
-        json.dump(metadata, json_file, ensure_ascii=False, indent=4)
+    with open(json_path, "wb") as json_file:
+        json_file.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
 
-    # Save to database
-    cursor.execute('''
-        INSERT OR IGNORE INTO products (
-            main_category, sub_category, nested_category, product_id, title, price, old_price, discount, description, additional_details, specs, images, json_path
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
+    return (
         main_category, sub_category, nested_category, product_id, product_title, product_price, product_old_price,
-        product_discount, product_description, additional_details, json.dumps(specs, ensure_ascii=False),
-        json.dumps(images), json_path
-    ))
-    db_connection.commit()
+        product_discount, product_description, additional_details, orjson.dumps(specs).decode(),
+        orjson.dumps(images).decode(), json_path
+    )
+
+def insert_products(db_connection, rows):
+    """
+    Insert a batch of product rows with a single prepared statement, in its own short transaction
+    so worker processes only hold the write lock briefly.
+    """
+    with db_connection:
+        db_connection.executemany(INSERT_PRODUCT_SQL, rows)
+
+def collect_product_links(subcategory_url):
+    """
+    Collect (product_id, product_link) pairs by walking the paginated listing (?page=N).
+    """
+    product_links = []
+    products_seen = set()  # Keep track of product IDs to avoid duplicates
+    page = 1
+
+    while len(product_links) < PRODUCTS_PER_SUBCATEGORY:
+        print(f"Crawling listing page {page}...")
+        try:
+            soup = get_soup(subcategory_url, params={"page": page}, parse_only=PRODUCT_CARD_STRAINER)
+        except requests.exceptions.RequestException as e:
+            if page == 1:
+                raise
+            # Pages past the last one often return an error; keep what was already collected
+            print(f"Stopping at listing page {page}: {e}")
+            break
+
+        new_products = 0
+        for card in soup.find_all(class_=PRODUCT_CARD_CLASS):
+            if len(product_links) >= PRODUCTS_PER_SUBCATEGORY:
+                break
+
+            product_id = card.get("data-product-id")
+            link_tag = card.find(class_=PRODUCT_LINK_CLASS)
+            if product_id and product_id not in products_seen and link_tag and link_tag.get("href"):
+                products_seen.add(product_id)
+                product_links.append((product_id, urljoin(BASE_URL, link_tag["href"])))
+                new_products += 1
+
+        if new_products == 0:
+            print("No more products to load.")
+            break
+        page += 1
 
-def crawl_products(subcategory_url, main_category, sub_category, nested_category):
+    return product_links
+
+async def collect_product_links_browser(page, subcategory_url):
     """
-    Crawl products from a nested subcategory page with infinite scrolling in headless mode.
+    Collect (product_id, product_link) pairs from a listing page with infinite scrolling in headless Chromium.
     """
-    # Set up Selenium with headless mode
-    options = Options()
-    options.add_argument("--headless")  # Run Chrome in headless mode
-    options.add_argument("--disable-gpu")  # Disable GPU for compatibility
-    options.add_argument("--no-sandbox")  # Bypass OS security model
-    options.add_argument("--disable-dev-shm-usage")  # Overcome limited resource problems
-    options.add_argument("--window-size=1920x1080")  # Ensure content is fully loaded
-
-    driver = webdriver.Chrome(options=options)  # Ensure you have the correct WebDriver installed
-    driver.get(subcategory_url)
-
-    crawled_count = 0
+    product_links = []
     products_seen = set()  # Keep track of product IDs to avoid duplicates
-    last_height = driver.execute_script("return document.body.scrollHeight")
 
-    while crawled_count < PRODUCTS_PER_SUBCATEGORY:
-        print(f"Crawling page (scroll iteration) for {main_category} > {sub_category} > {nested_category}...")
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(3)  # Wait for new products to load
+    await page.goto(subcategory_url)
+    try:
+        await page.wait_for_selector(f".{PRODUCT_CARD_CLASS}", timeout=SCROLL_TIMEOUT * 1000)
+    except PlaywrightTimeoutError:
+        print(f"No products found on {subcategory_url}.")
+        return product_links
+
+    last_height = await page.evaluate("() => document.body.scrollHeight")
 
-        # Extract product elements
-        product_elements = driver.find_elements(By.CLASS_NAME, "cp-card--product-card")
-        print(f"Found {len(product_elements)} products so far...")
+    while len(product_links) < PRODUCTS_PER_SUBCATEGORY:
+        # Read every card's id and link in a single round trip to the browser
+        product_cards = await page.evaluate(PRODUCT_CARDS_SCRIPT)
+        previous_count = len(product_cards)
+        print(f"Found {len(product_cards)} products so far on {subcategory_url}...")
 
-        for product in product_elements:
-            if crawled_count >= PRODUCTS_PER_SUBCATEGORY:
+        for card in product_cards:
+            if len(product_links) >= PRODUCTS_PER_SUBCATEGORY:
                 break
 
+            product_id = card.get("id")
+            product_link = card.get("href")
+            if product_id and product_link and product_id not in products_seen:
+                products_seen.add(product_id)
+                product_links.append((product_id, product_link))
+
+        if len(product_links) >= PRODUCTS_PER_SUBCATEGORY:
+            break
+
+        await page.evaluate("() => window.scrollTo(0, document.body.scrollHeight)")
+
+        # Wait until new products are rendered or the page grows, instead of a fixed sleep
+        try:
+            await page.wait_for_function(
+                NEW_CARDS_SCRIPT, arg=[previous_count, last_height],
+                timeout=SCROLL_TIMEOUT * 1000, polling=SCROLL_POLL_INTERVAL * 1000
+            )
+        except PlaywrightTimeoutError:
+            print("No more products to load.")
+            break
+        last_height = await page.evaluate("() => document.body.scrollHeight")
+
+    return product_links
+
+async def collect_all_product_links_browser(subcategory_urls):
+    """
+    Render the listing pages of several subcategories concurrently in one headless Chromium,
+    at most BROWSER_PAGES at a time. Returns one list of (product_id, product_link) pairs per URL.
+    """
+    semaphore = asyncio.Semaphore(BROWSER_PAGES)
+
+    async with async_playwright() as playwright:
+        # One Chromium for the whole crawl; contexts are cheap, so each subcategory gets a fresh one
+        browser = await playwright.chromium.launch(headless=True)
+
+        async def collect(subcategory_url):
+            async with semaphore:
+                # A fresh context keeps cookies, storage and cache isolated between subcategories
+                context = await browser.new_context(viewport={"width": 1920, "height": 1080})
+                try:
+                    page = await context.new_page()
+                    return await collect_product_links_browser(page, subcategory_url)
+                except Exception as e:
+                    print(f"Error collecting products from {subcategory_url}: {e}")
+                    return []
+                finally:
+                    await context.close()
+
+        try:
+            return await asyncio.gather(*(collect(url) for url in subcategory_urls))
+        finally:
+            await browser.close()
+
+def crawl_products(db_connection, subcategory_url, main_category, sub_category, nested_category, product_links=None):
+    """
+    Crawl products from a nested subcategory page: collect every product link first, then fetch details
+    on a thread pool of PRODUCT_WORKERS. Rows are inserted INSERT_BATCH_SIZE at a time.
+    product_links may be supplied when the listing was already rendered in the browser.
+    """
+    if product_links is None:
+        print(f"Collecting products for {main_category} > {sub_category} > {nested_category}...")
+        product_links = collect_product_links(subcategory_url)
+    print(f"Found {len(product_links)} products.")
+
+    # Fetch product pages concurrently; this thread is the only database writer
+    batch = []
+    with ThreadPoolExecutor(max_workers=PRODUCT_WORKERS) as executor:
+        futures = [
+            executor.submit(extract_product_metadata, product_link, main_category, sub_category, nested_category, product_id)
+            for product_id, product_link in product_links
+        ]
+        for future in as_completed(futures):
             try:
-                product_id = product.get_attribute("data-product-id")
-                if product_id and product_id not in products_seen:
-                    product_link = product.find_element(By.CLASS_NAME, "c-product-card__image-container").get_attribute("href")
-                    products_seen.add(product_id)
-                    crawled_count += 1
-
-                    # Crawl product metadata
-                    extract_product_metadata(product_link, main_category, sub_category, nested_category, product_id)
+                batch.append(future.result())
             except Exception as e:
                 print(f"Error processing product: {e}")
+                continue
 
-        # Check if we've reached the bottom of the page
-        new_height = driver.execute_script("return document.body.scrollHeight")
-        if new_height == last_height:
-            print("No more products to load.")
-            break
-        last_height = new_height
+            if len(batch) >= INSERT_BATCH_SIZE:
+                insert_products(db_connection, batch)
+                batch.clear()
+
+    if batch:
+        insert_products(db_connection, batch)
+
+    print(f"Finished crawling {len(product_links)} products for {nested_category}.")
+
+# Database connection owned by the current crawl worker process
+worker_connection = None
 
-    print(f"Finished crawling {crawled_count} products for {nested_category}.")
-    driver.quit()
+def init_worker():
+    """
+    Open a separate database connection in each crawl worker process.
+    """
+    global worker_connection
+    worker_connection = connect_db()
+
+def crawl_products_worker(subcategory_url, main_category, sub_category, nested_category, product_links=None):
+    """
+    Crawl one nested subcategory inside a worker process, reporting failures instead of aborting the pool.
+    """
+    print(f"\nCrawling products for {main_category} > {sub_category} > {nested_category}...\n")
+    try:
+        crawl_products(worker_connection, subcategory_url, main_category, sub_category, nested_category, product_links)
+    except Exception as e:
+        print(f"Error crawling {main_category} > {sub_category} > {nested_category}: {e}")
 
 def parse_categories(soup):
     """
@@ -285,6 +538,9 @@ def display_categories(categories):
 
 def crawl_categories():
     """Crawl categories and subcategories, display them, and ask for confirmation."""
+    db_connection = connect_db()
+    create_tables(db_connection)
+
     soup = get_soup(BASE_URL)
     categories = parse_categories(soup)
 
@@ -294,19 +550,45 @@ def crawl_categories():
     confirm = input("Do you want to start crawling these categories? (yes/no): ").strip().lower()
     if confirm != "yes":
         print("Aborting crawler.")
+        db_connection.close()
         return
 
-    # Save categories to the database and start crawling
+    # Save categories to the database and collect one crawl task per nested subcategory
+    tasks = []
+    tasks_seen = set()  # The menu can list a nested category twice; crawl each one once
     for main_category, sub_categories in categories.items():
         for sub_category, sub_subcategories in sub_categories.items():
             for nested_category, sub_sub_url in sub_subcategories:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO categories (main_category, sub_category, url)
-                    VALUES (?, ?, ?)
-                ''', (main_category, sub_category, sub_sub_url))
-                db_connection.commit()
-                print(f"\nCrawling products for {main_category} > {sub_category} > {nested_category}...\n")
-                crawl_products(sub_sub_url, main_category, sub_category, nested_category)
+                if (main_category, sub_category, nested_category) in tasks_seen:
+                    continue
+                tasks_seen.add((main_category, sub_category, nested_category))
+                tasks.append((sub_sub_url, main_category, sub_category, nested_category))
+
+    with db_connection:
+        db_connection.executemany('''
+            INSERT OR IGNORE INTO categories (main_category, sub_category, url)
+            VALUES (?, ?, ?)
+        ''', [(main_category, sub_category, sub_sub_url) for sub_sub_url, main_category, sub_category, _ in tasks])
+    db_connection.close()
+
+    # Render listings up front in a single browser when the site needs JavaScript for them
+    if USE_BROWSER:
+        print("\nCollecting product listings in the browser...\n")
+        browser_links = asyncio.run(collect_all_product_links_browser([task[0] for task in tasks]))
+        tasks = [task + (product_links,) for task, product_links in zip(tasks, browser_links)]
+
+    # Drop pooled keep-alive sockets so forked workers do not share the parent's TLS connections
+    SESSION.close()
+
+    # Each worker process owns its own database connection
+    try:
+        with multiprocessing.Pool(CATEGORY_PROCESSES, initializer=init_worker) as pool:
+            pool.starmap(crawl_products_worker, tasks)
+    finally:
+        # Index whatever was crawled, even if the run failed or was interrupted
+        db_connection = connect_db()
+        create_product_index(db_connection)
+        db_connection.close()
 
 
 if __name__ == "__main__":